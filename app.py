@@ -1,5 +1,8 @@
 import os
-from flask import Flask, request, jsonify, render_template, session, send_from_directory
+import re
+import json
+import threading
+from flask import Flask, request, jsonify, render_template, session, send_from_directory, Response, stream_with_context
 from flask_session import Session
 from config import Config
 from transcript_processor import TranscriptProcessor
@@ -8,6 +11,9 @@ from rag_engine import RAGEngine
 from infographic_generator import PollinationsGenerator, HuggingFaceGenerator, BriaInfographicGenerator
 import uuid
 from mindmap_generator import GeminiMindMapGenerator
+from bulk_ingest import BulkIngestor
+from infographic_assets import load_manifest, save_infographic_assets
+from provider_orchestrator import InfographicOrchestrator
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -20,6 +26,15 @@ vs_manager = VectorStoreManager()
 rag_engine = RAGEngine()
 infographic_gen = BriaInfographicGenerator()
 mindmap_gen = GeminiMindMapGenerator()
+hf_gen = HuggingFaceGenerator()
+infographic_orchestrator = InfographicOrchestrator(
+    {
+        "bria": lambda summary, details, style, cancel: infographic_gen.generate_infographic(summary, details, style, cancel_event=cancel),
+        "pollinations": lambda summary, details, style, cancel: PollinationsGenerator.generate_infographic(summary, style, cancel_event=cancel),
+        "huggingface": lambda summary, details, style, cancel: hf_gen.generate_infographic(summary, style, cancel_event=cancel),
+    },
+    prior_latencies=Config.INFOGRAPHIC_PRIOR_LATENCIES
+)
 
 @app.route('/')
 def index():
@@ -53,8 +68,17 @@ def process_video():
         if 'session_id' not in session:
             session['session_id'] = str(uuid.uuid4())
             
-        # Create vector store for this session
-        vs_manager.create_vector_store(transcript, session['session_id'])
+        # Create vector store for this session; with progressive indexing it is
+        # queryable as soon as the first batch of chunks is embedded
+        if vs_manager.has_video_store(video_id):
+            # Pre-ingested by bulk ingestion: reuse its index instead of re-embedding
+            vs_manager.copy_video_store(video_id, session['session_id'])
+            index_status = vs_manager.get_index_status(session['session_id'])
+        elif Config.PROGRESSIVE_INDEXING:
+            index_status = vs_manager.start_progressive_index(transcript, session['session_id'])
+        else:
+            vs_manager.create_vector_store(transcript, session['session_id'])
+            index_status = vs_manager.get_index_status(session['session_id'])
         
         # Store metadata in session
         session['video_id'] = video_id
@@ -64,12 +88,55 @@ def process_video():
         return jsonify({
             "status": "success",
             "video_id": video_id,
-            "metadata": metadata
+            "metadata": metadata,
+            "index": index_status
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/bulk-ingest', methods=['POST'])
+def bulk_ingest():
+    """
+    Starts a background bulk ingestion of many video URLs/IDs.
+    Passing an existing job_id resumes from its checkpoint.
+    """
+    data = request.json
+    urls = data.get('urls')
+
+    if not isinstance(urls, list) or not urls or not all(isinstance(u, str) for u in urls):
+        return jsonify({"error": "A non-empty list of URLs is required"}), 400
+
+    job_id = data.get('job_id') or str(uuid.uuid4())
+    if not re.fullmatch(r'[0-9A-Za-z_-]+', job_id):
+        return jsonify({"error": "Invalid job_id"}), 400
+
+    # The lock file makes the running check hold across all gunicorn workers
+    ingestor = BulkIngestor(os.path.join(Config.BULK_CHECKPOINT_DIR, f"{job_id}.json"))
+    if not ingestor.acquire_lock():
+        return jsonify({"error": "Job is already running"}), 409
+
+    try:
+        ingestor.prepare(urls)
+    except Exception:
+        ingestor.release_lock()
+        raise
+    threading.Thread(target=ingestor.run, args=(urls,), daemon=True).start()
+
+    return jsonify({"status": "accepted", "job_id": job_id}), 202
+
+@app.route('/api/bulk-ingest/<job_id>', methods=['GET'])
+def bulk_ingest_status(job_id):
+    """
+    Reports a bulk ingestion from its checkpoint file, so any worker can answer.
+    """
+    if not re.fullmatch(r'[0-9A-Za-z_-]+', job_id):
+        return jsonify({"error": "Invalid job_id"}), 400
+    status = BulkIngestor.read_status(os.path.join(Config.BULK_CHECKPOINT_DIR, f"{job_id}.json"))
+    if status is None:
+        return jsonify({"error": "Bulk ingestion job not found"}), 404
+    return jsonify(status)
+
 @app.route('/api/ask-question', methods=['POST'])
 def ask_question():
     data = request.json
@@ -91,24 +158,84 @@ def ask_question():
         answer = rag_engine.get_answer(vector_store, question)
         
         return jsonify({
-            "answer": answer
+            "answer": answer,
+            "index": vs_manager.get_index_status(session['session_id'])
         })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/ask-questions', methods=['POST'])
+def ask_questions():
+    """
+    Answers a list of questions in one request. Returns answers in order, or streams
+    them as NDJSON lines as they complete when "stream" is true.
+    """
+    data = request.json
+    questions = data.get('questions')
+    stream = data.get('stream', False)
+    max_concurrency = data.get('max_concurrency')
+
+    if not isinstance(questions, list) or not questions:
+        return jsonify({"error": "A non-empty list of questions is required"}), 400
+    if not all(isinstance(q, str) and q.strip() for q in questions):
+        return jsonify({"error": "Every question must be a non-empty string"}), 400
+    if len(questions) > Config.BATCH_QA_MAX_QUESTIONS:
+        return jsonify({"error": f"At most {Config.BATCH_QA_MAX_QUESTIONS} questions per request"}), 400
+    if max_concurrency is not None:
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            return jsonify({"error": "max_concurrency must be a positive integer"}), 400
+        max_concurrency = min(max_concurrency, Config.BATCH_QA_MAX_CONCURRENCY)
+
+    if 'session_id' not in session:
+        return jsonify({"error": "Session expired or no video processed"}), 401
+
+    try:
+        vector_store = vs_manager.load_vector_store(session['session_id'])
+        if not vector_store:
+            return jsonify({"error": "Vector store not found. Please re-process the video."}), 404
+
+        if stream:
+            def generate():
+                try:
+                    for index, answer, error in rag_engine.iter_answers(vector_store, questions, max_concurrency):
+                        yield json.dumps({"index": index, "question": questions[index], "answer": answer, "error": error}) + "\n"
+                except Exception as e:
+                    yield json.dumps({"error": str(e)}) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        return jsonify({
+            "answers": rag_engine.get_answers(vector_store, questions, max_concurrency),
+            "index": vs_manager.get_index_status(session['session_id'])
+        })
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/index-status', methods=['GET'])
+def get_index_status():
+    if 'session_id' not in session:
+        return jsonify({"error": "Session expired or no video processed"}), 401
+    status = vs_manager.get_index_status(session['session_id'])
+    if status is None:
+        return jsonify({"error": "Vector store not found. Please re-process the video."}), 404
+    return jsonify(status)
+
 @app.route('/api/generate-infographic', methods=['POST'])
 def generate_infographic():
     """
-    Generates an infographic based on video summary using Replicate with fallbacks.
+    Generates an infographic based on video summary, racing Bria and the `use_fallback`
+    provider (Pollinations or HuggingFace) with hedging and keeping the first acceptable image.
     """
     if 'video_id' not in session:
         return jsonify({"error": "No video processed"}), 400
     
     data = request.json
     style = data.get('style', 'notebooklm')
-    model = data.get('model', 'flux-schnell')
     use_fallback = data.get('use_fallback', 'pollinations')
+    if use_fallback not in ('pollinations', 'huggingface'):
+        return jsonify({"error": "use_fallback must be 'pollinations' or 'huggingface'"}), 400
     
     try:
         video_id = session['video_id']
@@ -122,63 +249,33 @@ def generate_infographic():
             vector_store, 
             "Provide a brief 2-3 sentence summary covering the main topic and key points of this video. Use clear, descriptive language."
         )
-        # New High-Quality Flow
-        try:
-            # Extract high-quality metadata for the prompt
-            infographic_data = rag_engine.get_infographic_details(vector_store)
-            print(f"Extracted Infographic Data: {infographic_data}")
-            
-            # Try Bria first (Primary) with the new template
-            filepath = infographic_gen.generate_and_save(summary, video_id, infographic_data, style)
-            if filepath:
-                relative_path = f"/static/infographics/{video_id}_infographic.png"
-                return jsonify({
-                    "status": "success",
-                    "infographic_url": relative_path,
-                    "summary": summary,
-                    "generator": "bria",
-                    "details": infographic_data
-                })
-        except Exception as bria_error:
-            print(f"Bria failed: {str(bria_error)}")
-
-        # Try Replicate second
-        try:
-            # Replicate removed as per user request to focus on Bria
-            pass
-        except Exception as replicate_error:
-            print(f"Replicate failed: {str(replicate_error)}")
-        
-        # Fallback to Pollinations or HuggingFace
-        if use_fallback == 'pollinations':
-            image = PollinationsGenerator.generate_infographic(summary, style)
-            if image:
-                filepath = PollinationsGenerator.save_infographic(image, video_id)
-                relative_path = f"/static/infographics/{video_id}_infographic.png"
-                return jsonify({
-                    "status": "success",
-                    "infographic_url": relative_path,
-                    "summary": summary,
-                    "generator": "pollinations"
-                })
-        else:
-            hf_gen = HuggingFaceGenerator()
-            image = hf_gen.generate_infographic(summary, style)
-            if image:
-                filepath = PollinationsGenerator.save_infographic(image, video_id)
-                relative_path = f"/static/infographics/{video_id}_infographic.png"
-                return jsonify({
-                    "status": "success",
-                    "infographic_url": relative_path,
-                    "summary": summary,
-                    "generator": "huggingface"
-                })
-        
-        return jsonify({"error": "All infographic generators failed"}), 500
+        # Extract high-quality metadata for the prompt
+        infographic_data = rag_engine.get_infographic_details(vector_store)
+        print(f"Extracted Infographic Data: {infographic_data}")
+
+        generator, image = infographic_orchestrator.generate(
+            summary, infographic_data, style, candidates=("bria", use_fallback)
+        )
+        if image is None:
+            return jsonify({"error": "All infographic generators failed"}), 500
+
+        assets = save_infographic_assets(image, video_id)
+        return jsonify({
+            "status": "success",
+            "infographic_url": assets["url"],
+            "assets": assets,
+            "summary": summary,
+            "generator": generator,
+            "details": infographic_data
+        })
             
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/infographic-providers', methods=['GET'])
+def get_infographic_provider_stats():
+    return jsonify(infographic_orchestrator.get_stats())
+
 @app.route('/api/generate-mindmap', methods=['POST'])
 def generate_mindmap():
     """
@@ -219,6 +316,13 @@ def get_video_metadata():
         return jsonify(session['video_metadata'])
     return jsonify({"error": "No video metadata found"}), 404
 
+@app.route('/api/embedding-stats', methods=['GET'])
+def get_embedding_stats():
+    stats = vs_manager.get_embedding_stats()
+    if stats is None:
+        return jsonify({"error": "Query embedding batching is disabled"}), 404
+    return jsonify(stats)
+
 @app.route('/api/clear-session', methods=['DELETE'])
 def clear_session():
     if 'session_id' in session:
@@ -227,9 +331,36 @@ def clear_session():
     return jsonify({"status": "session cleared"})
 
 # Serve static infographics
+HASHED_INFOGRAPHIC = re.compile(r'^[0-9A-Za-z_-]+_infographic\.([0-9a-f]{12})\.')
+
 @app.route('/static/infographics/<path:filename>')
 def serve_infographic(filename):
-    return send_from_directory(Config.INFOGRAPHICS_DIR, filename)
+    match = HASHED_INFOGRAPHIC.match(filename)
+    if not match:
+        # Un-hashed names (manifests, legacy files) can change in place
+        return send_from_directory(Config.INFOGRAPHICS_DIR, filename, max_age=60)
+
+    # Content-hashed names never change, so they can be cached forever
+    response = send_from_directory(
+        Config.INFOGRAPHICS_DIR, filename,
+        max_age=Config.INFOGRAPHIC_CACHE_MAX_AGE,
+        etag=f"{match.group(1)}-{filename.rsplit('.', 1)[-1]}"
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/api/infographic', methods=['GET'])
+def get_infographic():
+    """
+    Returns the asset manifest (URLs, srcset, byte sizes) of the current video's infographic.
+    """
+    if 'video_id' not in session:
+        return jsonify({"error": "No video processed"}), 400
+    manifest = load_manifest(session['video_id'])
+    if not manifest:
+        return jsonify({"error": "No infographic generated yet"}), 404
+    return jsonify(manifest)
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import resource
+import multiprocessing as mp
+
+# Ensure we are in the right directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+import numpy as np
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+
+# Minimum acceptable cosine similarity against the PyTorch reference
+PARITY_THRESHOLDS = {"onnx": 0.999, "onnx-int8": 0.98}
+
+SAMPLE_TEXTS = [
+    "In this video we walk through how retrieval augmented generation works end to end.",
+    "First the transcript is split into overlapping chunks of about a thousand characters.",
+    "Each chunk is embedded and stored in a FAISS index on disk for the session.",
+    "When a question comes in, we embed it and retrieve the four most similar chunks.",
+    "The language model then answers using only that retrieved context.",
+    "Budgeting, savings and transparency are the three themes of personal finance covered here.",
+    "Quantum computers use qubits which can exist in superposition of zero and one.",
+    "The universe is a vast expanse of space and time.",
+]
+
+
+def load_texts(path, count):
+    """Builds `count` chunk-sized texts from a transcript file, or repeats the built-in samples."""
+    if path:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        texts = [doc.page_content for doc in splitter.create_documents([text])]
+    else:
+        texts = list(SAMPLE_TEXTS)
+    return (texts * (count // len(texts) + 1))[:count]
+
+
+def rss_mb():
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend, texts, repeats, result_queue):
+    """Runs in a fresh process so peak RSS reflects only this backend."""
+    from vector_store_manager import build_embeddings
+
+    baseline_rss = rss_mb()
+    load_start = time.time()
+    embeddings = build_embeddings(backend)
+    load_time = time.time() - load_start
+    actual = type(embeddings).__name__
+
+    embeddings.embed_documents(texts[:8])  # warm-up
+
+    start = time.time()
+    for _ in range(repeats):
+        vectors = embeddings.embed_documents(texts)
+    elapsed = time.time() - start
+
+    query_start = time.time()
+    for text in texts[:50]:
+        embeddings.embed_query(text)
+    query_elapsed = time.time() - query_start
+
+    result_queue.put({
+        "backend": backend,
+        "class": actual,
+        "load_s": load_time,
+        "docs_per_s": len(texts) * repeats / elapsed,
+        "query_ms": query_elapsed / min(len(texts), 50) * 1000,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - baseline_rss,
+        "vectors": np.asarray(vectors, dtype=np.float32),
+    })
+
+
+def wait_for_result(proc, result_queue, timeout):
+    """Waits for a child's result; returns None if it exits without one or times out."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            return result_queue.get(timeout=1)
+        except queue.Empty:
+            if not proc.is_alive():
+                # The child may have exited right after its result was flushed
+                try:
+                    return result_queue.get(timeout=1)
+                except queue.Empty:
+                    return None
+    proc.kill()
+    return None
+
+
+def cosine_drift(reference, candidate):
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosines = (ref * cand).sum(axis=1)
+    return float(cosines.mean()), float(cosines.min())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and throughput/RSS benchmark for embedding backends.")
+    parser.add_argument("--transcript", help="Path to a plain-text transcript to chunk (default: built-in samples)")
+    parser.add_argument("--count", type=int, default=256, help="Number of texts to embed per pass")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes per backend")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds to wait for each backend (export included)")
+    args = parser.parse_args()
+
+    texts = load_texts(args.transcript, args.count)
+    ctx = mp.get_context("spawn")
+    results = {}
+    crashed = []
+
+    for backend in args.backends:
+        print(f"Benchmarking {backend}...")
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=run_backend, args=(backend, texts, args.repeats, result_queue))
+        proc.start()
+        result = wait_for_result(proc, result_queue, args.timeout)
+        if result is None:
+            print(f"  {backend} crashed or timed out (exit code {proc.exitcode}), skipped")
+            crashed.append(backend)
+        else:
+            results[backend] = result
+        proc.join()
+
+    print(f"\n{'backend':<10} {'class':<22} {'load s':>7} {'docs/s':>9} {'query ms':>9} {'peak RSS MB':>12} {'model RSS MB':>13}")
+    for backend, r in results.items():
+        print(f"{backend:<10} {r['class']:<22} {r['load_s']:>7.1f} {r['docs_per_s']:>9.1f} "
+              f"{r['query_ms']:>9.2f} {r['rss_mb']:>12.1f} {r['rss_delta_mb']:>13.1f}")
+
+    if "torch" not in results:
+        return 1 if crashed else 0
+
+    failed = bool(crashed)
+    print("\nCosine parity vs torch:")
+    reference = results["torch"]["vectors"]
+    for backend, threshold in PARITY_THRESHOLDS.items():
+        if backend not in results:
+            continue
+        if results[backend]["class"] == results["torch"]["class"]:
+            print(f"  {backend}: fell back to PyTorch, skipped")
+            continue
+        mean_cos, min_cos = cosine_drift(reference, results[backend]["vectors"])
+        ok = min_cos >= threshold
+        failed = failed or not ok
+        print(f"  {backend}: mean={mean_cos:.5f} min={min_cos:.5f} threshold={threshold} {'PASS' if ok else 'FAIL'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import subprocess
+import multiprocessing as mp
+
+# Ensure we are in the right directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from benchmark_embeddings import wait_for_result
+
+MODES = ["none", "preload", "server"]
+
+QUERIES = [
+    "What is the main topic of this video?",
+    "Summarize the key takeaways in one sentence.",
+    "Which examples does the speaker use?",
+    "How does the speaker define retrieval augmented generation?",
+]
+
+
+def memory_mb(pid):
+    """Returns (rss, pss, uss) in MB for a process, read from /proc (Linux only)."""
+    values = {"Rss": 0, "Pss": 0, "Private_Clean": 0, "Private_Dirty": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in values:
+                values[key] = int(rest.split()[0]) / 1024
+    return values["Rss"], values["Pss"], values["Private_Clean"] + values["Private_Dirty"]
+
+
+def worker(mode, shared, socket_path, duration, ready, start, results):
+    if mode == "server":
+        from embedding_server import RemoteEmbeddings
+        embeddings = RemoteEmbeddings(socket_path)
+    elif mode == "preload":
+        embeddings = shared
+    else:
+        from vector_store_manager import build_embeddings
+        embeddings = build_embeddings()
+
+    embeddings.embed_query("warm-up")
+    ready.release()
+    start.wait()
+
+    count = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        embeddings.embed_query(QUERIES[count % len(QUERIES)])
+        count += 1
+    results.put((os.getpid(), count))
+    # Stay alive until the parent has sampled memory
+    time.sleep(3)
+
+
+def wait_for_socket(path, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def wait_until_ready(ready, procs, timeout):
+    """Waits for every worker to finish warming up; raises if one dies or the timeout passes."""
+    deadline = time.time() + timeout
+    pending = len(procs)
+    while pending:
+        if ready.acquire(timeout=1):
+            pending -= 1
+            continue
+        dead = [p.exitcode for p in procs if p.exitcode is not None]
+        if dead:
+            raise RuntimeError(f"A worker died while loading the model (exit codes {dead})")
+        if time.time() > deadline:
+            raise RuntimeError(f"Workers not ready after {timeout:.0f}s")
+
+
+def run_mode(mode, workers, duration, socket_path, load_timeout=600):
+    ctx = mp.get_context("fork")
+    shared = None
+    server_proc = None
+    procs = []
+
+    try:
+        if mode == "preload":
+            from vector_store_manager import build_embeddings
+            shared = build_embeddings()
+            import gc
+            gc.freeze()
+        elif mode == "server":
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server_proc = subprocess.Popen([sys.executable, os.path.join(current_dir, "embedding_server.py"), "--socket", socket_path])
+            if not wait_for_socket(socket_path, timeout=load_timeout):
+                raise RuntimeError("Embedding server did not start")
+
+        ready = ctx.Semaphore(0)
+        start = ctx.Event()
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(mode, shared, socket_path, duration, ready, start, results)) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        wait_until_ready(ready, procs, load_timeout)
+
+        start.set()
+        try:
+            # Workers report shortly after `duration`; a missing report means one crashed
+            counts = [results.get(timeout=duration + 60) for _ in procs]
+        except queue.Empty:
+            raise RuntimeError(f"A worker in mode '{mode}' crashed (exit codes {[p.exitcode for p in procs]})")
+        memory = [memory_mb(pid) for pid, _ in counts]
+        server_memory = memory_mb(server_proc.pid) if server_proc else (0, 0, 0)
+
+        for p in procs:
+            p.join()
+    finally:
+        # Never leave workers or the embedding server behind, whatever went wrong
+        for p in procs:
+            if p.is_alive():
+                p.kill()
+                p.join()
+        if server_proc and server_proc.poll() is None:
+            server_proc.terminate()
+            try:
+                server_proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server_proc.kill()
+                server_proc.wait()
+
+    total_queries = sum(c for _, c in counts)
+    return {
+        "mode": mode,
+        "qps": total_queries / duration,
+        "rss_per_worker": sum(m[0] for m in memory) / workers,
+        "pss_per_worker": sum(m[1] for m in memory) / workers,
+        "uss_per_worker": sum(m[2] for m in memory) / workers,
+        "server_pss": server_memory[1],
+        "total_pss": sum(m[1] for m in memory) + server_memory[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-per-worker and query throughput for embedding sharing modes.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of queries per mode")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--socket", default="/tmp/yt_rag_embeddings_bench.sock")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for each mode's model load and warm-up")
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.modes:
+        print(f"Running mode '{mode}' with {args.workers} workers...")
+        # Run each mode from a fresh process so preloaded models don't leak into the next mode
+        ctx = mp.get_context("spawn")
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=_run_mode_child, args=(result_queue, mode, args.workers, args.duration, args.socket, args.timeout))
+        proc.start()
+        # run_mode enforces its own timeouts and cleans up; this outer limit is only a backstop
+        result = wait_for_result(proc, result_queue, args.timeout * 2 + args.duration + 120)
+        proc.join()
+        if result is None:
+            print(f"  mode '{mode}' crashed or timed out (exit code {proc.exitcode}), skipped")
+            continue
+        rows.append(result)
+
+    print(f"\n{'mode':<9} {'queries/s':>10} {'RSS/worker':>11} {'PSS/worker':>11} {'USS/worker':>11} {'server PSS':>11} {'total PSS':>10}")
+    for r in rows:
+        print(f"{r['mode']:<9} {r['qps']:>10.1f} {r['rss_per_worker']:>11.1f} {r['pss_per_worker']:>11.1f} "
+              f"{r['uss_per_worker']:>11.1f} {r['server_pss']:>11.1f} {r['total_pss']:>10.1f}")
+    print("\nMemory in MB. PSS splits shared pages between the processes that map them.")
+    return 0
+
+
+def _run_mode_child(result_queue, mode, workers, duration, socket_path, load_timeout):
+    result_queue.put(run_mode(mode, workers, duration, socket_path, load_timeout))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
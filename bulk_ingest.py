@@ -0,0 +1,366 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Ensure we are in the right directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from config import Config
+from transcript_processor import TranscriptProcessor
+
+_worker_manager = None
+
+
+def _init_embed_worker():
+    global _worker_manager
+    from vector_store_manager import VectorStoreManager
+    _worker_manager = VectorStoreManager()
+
+
+def _embed_video(video_id, transcript):
+    """Runs in the process pool: builds and saves the video's vector store."""
+    start = time.time()
+    chunks = _worker_manager.create_video_store(transcript, video_id)
+    return chunks, time.time() - start
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.completed = 0
+        self.failed = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.first_start = None
+        self.last_end = None
+        self._lock = threading.Lock()
+
+    def record(self, started, duration, ok, items=0):
+        with self._lock:
+            self._record(started, duration, ok, items)
+
+    def _record(self, started, duration, ok, items):
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = max(self.last_end or 0, started + duration)
+        self.busy_seconds += duration
+        if ok:
+            self.completed += 1
+            self.items += items
+        else:
+            self.failed += 1
+
+    def to_dict(self):
+        wall = (self.last_end - self.first_start) if self.first_start else 0
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "wall_seconds": round(wall, 2),
+            "busy_seconds": round(self.busy_seconds, 2),
+            "videos_per_second": round(self.completed / wall, 3) if wall else None,
+            "items_per_second": round(self.items / wall, 2) if wall and self.items else None
+        }
+
+
+def _build_report(videos, video_ids, started_at, finished_at, stages):
+    videos = {v: dict(videos.get(v, {})) for v in video_ids}
+    counts = {}
+    for entry in videos.values():
+        counts[entry.get("status")] = counts.get(entry.get("status"), 0) + 1
+    elapsed = (finished_at or time.time()) - started_at if started_at else 0
+    return {
+        "total": len(video_ids),
+        "done": counts.get("done", 0),
+        "failed": counts.get("failed", 0),
+        "in_progress": counts.get("fetching", 0) + counts.get("embedding", 0),
+        "complete": finished_at is not None,
+        "elapsed_seconds": round(elapsed, 2),
+        "stages": stages,
+        "videos": videos
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BulkIngestor:
+    """
+    Ingests many videos at once: transcript/metadata fetching runs in a thread pool
+    (I/O bound) and feeds chunking/embedding in a process pool (CPU bound).
+    Progress is checkpointed after every video so an interrupted run can resume,
+    and any process can report it with read_status(). A lock file next to the
+    checkpoint keeps two processes from running the same job.
+    """
+
+    def __init__(self, checkpoint_path, fetch_workers=None, embed_workers=None):
+        self.checkpoint_path = checkpoint_path
+        self.fetch_workers = fetch_workers or Config.BULK_FETCH_WORKERS
+        self.embed_workers = embed_workers or Config.BULK_EMBED_WORKERS
+        self.stats = {"fetch": StageStats("fetch"), "embed": StageStats("embed")}
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+        self._pending = 0
+        self.videos = self._load_checkpoint()
+        self.video_ids = []
+        self.started_at = None
+        self.finished_at = None
+        self.lock_path = f"{checkpoint_path}.lock"
+        self._locked = False
+
+    def acquire_lock(self):
+        """
+        Claims the job for this process. Returns False if another live process
+        is running it; a lock left behind by a dead process is taken over.
+        """
+        if self._locked:
+            return True
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if self._lock_holder_alive():
+                    return False
+                try:
+                    os.remove(self.lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            self._locked = True
+            return True
+        return False
+
+    def _lock_holder_alive(self):
+        try:
+            with open(self.lock_path, "r") as f:
+                content = f.read().strip()
+            modified = os.path.getmtime(self.lock_path)
+        except FileNotFoundError:
+            return False
+        if not content:
+            # Just created by a process that hasn't written its pid yet
+            return time.time() - modified < 60
+        try:
+            return _pid_alive(int(content))
+        except ValueError:
+            return False
+
+    def release_lock(self):
+        if self._locked:
+            self._locked = False
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def read_status(checkpoint_path):
+        """Builds the status report from a checkpoint file, or None if it doesn't exist."""
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return _build_report(
+            checkpoint.get("videos", {}),
+            checkpoint.get("video_ids", list(checkpoint.get("videos", {}))),
+            checkpoint.get("started_at"),
+            checkpoint.get("finished_at"),
+            checkpoint.get("stats", {})
+        )
+
+    def _load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("videos", {})
+        return {}
+
+    def _save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "video_ids": self.video_ids,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "videos": self.videos,
+                "stats": self.stage_stats()
+            }, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _update(self, video_id, **fields):
+        with self._lock:
+            self.videos.setdefault(video_id, {}).update(fields)
+            if fields.get("status") in ("done", "failed"):
+                self._pending -= 1
+                if self._pending == 0:
+                    self._all_done.set()
+            self._save_checkpoint()
+
+    @staticmethod
+    def resolve_video_ids(items):
+        """Turns URLs/IDs into unique video IDs; returns (video_ids, invalid_items)."""
+        video_ids, invalid = [], []
+        for item in items:
+            video_id = TranscriptProcessor.extract_video_id(item.strip())
+            if not video_id:
+                invalid.append(item)
+            elif video_id not in video_ids:
+                video_ids.append(video_id)
+        return video_ids, invalid
+
+    def _fetch(self, video_id):
+        started = time.time()
+        metadata = TranscriptProcessor.get_metadata(video_id)
+        transcript = TranscriptProcessor.get_transcript(video_id)
+        return metadata, transcript, started
+
+    def prepare(self, items):
+        """
+        Resolves the items and records the job as started in the checkpoint,
+        so its status is readable before run() gets going.
+        """
+        video_ids, invalid = self.resolve_video_ids(items)
+        for item in invalid:
+            print(f"Skipping invalid YouTube URL/ID: {item}")
+        with self._lock:
+            self.video_ids = video_ids
+            self.started_at = time.time()
+            self.finished_at = None
+            self._save_checkpoint()
+
+    def run(self, items):
+        """
+        Ingests all videos not already marked done in the checkpoint.
+        Returns the final status report.
+        Raises RuntimeError if another process is already running this job.
+        """
+        if not self.acquire_lock():
+            raise RuntimeError(f"Bulk ingestion job {self.checkpoint_path} is already running")
+        try:
+            return self._run(items)
+        finally:
+            self.release_lock()
+
+    def _run(self, items):
+        if self.started_at is None:
+            self.prepare(items)
+        video_ids = self.video_ids
+        pending = [v for v in video_ids if self.videos.get(v, {}).get("status") != "done"]
+        self._pending = len(pending)
+        print(f"{len(video_ids) - len(pending)} of {len(video_ids)} videos already ingested, {len(pending)} to go")
+
+        if pending:
+            ctx = mp.get_context("spawn")
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetch_pool, \
+                    ProcessPoolExecutor(max_workers=self.embed_workers, mp_context=ctx,
+                                        initializer=_init_embed_worker) as embed_pool:
+                for video_id in pending:
+                    self._update(video_id, status="fetching", error=None)
+                    future = fetch_pool.submit(self._fetch, video_id)
+                    future.add_done_callback(
+                        lambda f, vid=video_id, t=time.time(): self._on_fetched(vid, f, embed_pool, t)
+                    )
+                self._all_done.wait()
+
+        with self._lock:
+            self.finished_at = time.time()
+            self._save_checkpoint()
+        return self.status()
+
+    def _on_fetched(self, video_id, future, embed_pool, submitted):
+        try:
+            metadata, transcript, started = future.result()
+        except Exception as e:
+            self.stats["fetch"].record(submitted, time.time() - submitted, ok=False)
+            self._update(video_id, status="failed", stage="fetch", error=str(e))
+            return
+
+        self.stats["fetch"].record(started, time.time() - started, ok=True)
+        self._update(video_id, status="embedding", title=metadata.get("title"))
+        try:
+            embed_future = embed_pool.submit(_embed_video, video_id, transcript)
+        except Exception as e:
+            self._update(video_id, status="failed", stage="embed", error=str(e))
+            return
+        embed_future.add_done_callback(lambda f: self._on_embedded(video_id, f))
+
+    def _on_embedded(self, video_id, future):
+        try:
+            chunks, duration = future.result()
+        except Exception as e:
+            self.stats["embed"].record(time.time(), 0, ok=False)
+            self._update(video_id, status="failed", stage="embed", error=str(e))
+            return
+
+        self.stats["embed"].record(time.time() - duration, duration, ok=True, items=chunks)
+        self._update(video_id, status="done", chunks=chunks)
+        print(f"Ingested {video_id} ({chunks} chunks)")
+
+    def stage_stats(self):
+        return {name: stage.to_dict() for name, stage in self.stats.items()}
+
+    def status(self):
+        with self._lock:
+            return _build_report(self.videos, self.video_ids, self.started_at, self.finished_at, self.stage_stats())
+
+
+def read_items(args):
+    """Expands arguments that are files (one URL/ID per line) into their lines."""
+    items = []
+    for arg in args:
+        if os.path.isfile(arg):
+            with open(arg, "r", encoding="utf-8") as f:
+                items.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        else:
+            items.append(arg)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest YouTube videos into pre-built vector stores.")
+    parser.add_argument("inputs", nargs="+", help="Video URLs/IDs, or files with one URL/ID per line")
+    parser.add_argument("--checkpoint", default=os.path.join(Config.BULK_CHECKPOINT_DIR, "cli.json"),
+                        help="Checkpoint file; re-running with the same file resumes")
+    parser.add_argument("--fetch-workers", type=int, default=Config.BULK_FETCH_WORKERS)
+    parser.add_argument("--embed-workers", type=int, default=Config.BULK_EMBED_WORKERS)
+    args = parser.parse_args()
+
+    ingestor = BulkIngestor(args.checkpoint, args.fetch_workers, args.embed_workers)
+    try:
+        report = ingestor.run(read_items(args.inputs))
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    print(f"\nDone: {report['done']}/{report['total']}, failed: {report['failed']}, "
+          f"elapsed: {report['elapsed_seconds']}s")
+    for name, stage in report["stages"].items():
+        print(f"  {name:<6} completed={stage['completed']} failed={stage['failed']} "
+              f"videos/s={stage['videos_per_second']} items/s={stage['items_per_second']} "
+              f"busy={stage['busy_seconds']}s")
+    for video_id, entry in report["videos"].items():
+        if entry.get("status") == "failed":
+            print(f"  FAILED {video_id} at {entry.get('stage')}: {entry.get('error')}")
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,67 @@ class Config:
     EMBEDDINGS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
     LLM_MODEL = "llama-3.1-8b-instant"
 
+    # Embedding backend: torch | onnx | onnx-int8
+    EMBEDDINGS_BACKEND = os.environ.get("EMBEDDINGS_BACKEND", "torch")
+    ONNX_MODELS_DIR = os.environ.get("ONNX_MODELS_DIR", os.path.join(os.getcwd(), 'onnx_models'))
+    ONNX_NUM_THREADS = int(os.environ.get("ONNX_NUM_THREADS", 0))
+
+    # Query embedding micro-batching across concurrent requests
+    EMBED_BATCHING = os.environ.get("EMBED_BATCHING", "true").lower() == "true"
+    EMBED_BATCH_MAX_SIZE = int(os.environ.get("EMBED_BATCH_MAX_SIZE", 32))
+    EMBED_BATCH_MAX_WAIT_MS = float(os.environ.get("EMBED_BATCH_MAX_WAIT_MS", 5))
+
+    # Unix socket of a shared embedding server (embedding_server.py); empty loads the model in-process
+    EMBEDDINGS_SERVER_SOCKET = os.environ.get("EMBEDDINGS_SERVER_SOCKET", "")
+
+    # Progressive indexing: answer questions while the transcript is still being embedded
+    PROGRESSIVE_INDEXING = os.environ.get("PROGRESSIVE_INDEXING", "true").lower() == "true"
+    PROGRESSIVE_FIRST_BATCH = int(os.environ.get("PROGRESSIVE_FIRST_BATCH", 16))
+    PROGRESSIVE_BATCH_SIZE = int(os.environ.get("PROGRESSIVE_BATCH_SIZE", 64))
+    # Persist the partial index every N background batches so every worker can search it
+    PROGRESSIVE_SAVE_EVERY = int(os.environ.get("PROGRESSIVE_SAVE_EVERY", 4))
+    INGESTION_WORKERS = int(os.environ.get("INGESTION_WORKERS", 2))
+
+    # Batch question answering
+    BATCH_QA_MAX_CONCURRENCY = int(os.environ.get("BATCH_QA_MAX_CONCURRENCY", 4))
+    BATCH_QA_MAX_QUESTIONS = int(os.environ.get("BATCH_QA_MAX_QUESTIONS", 50))
+
+    # Bulk ingestion
+    BULK_FETCH_WORKERS = int(os.environ.get("BULK_FETCH_WORKERS", 8))
+    BULK_EMBED_WORKERS = int(os.environ.get("BULK_EMBED_WORKERS", 2))
+    BULK_CHECKPOINT_DIR = os.path.join(os.getcwd(), 'bulk_checkpoints')
+
+    # Transcript / metadata cache (seconds)
+    TRANSCRIPT_CACHE_DIR = os.path.join(os.getcwd(), 'transcript_cache')
+    TRANSCRIPT_CACHE_TTL = int(os.environ.get("TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600))
+    METADATA_CACHE_TTL = int(os.environ.get("METADATA_CACHE_TTL", 24 * 3600))
+    NEGATIVE_CACHE_TTL = int(os.environ.get("NEGATIVE_CACHE_TTL", 600))
+
+    # Infographic assets
+    INFOGRAPHIC_WEBP_QUALITY = int(os.environ.get("INFOGRAPHIC_WEBP_QUALITY", 85))
+    INFOGRAPHIC_AVIF_QUALITY = int(os.environ.get("INFOGRAPHIC_AVIF_QUALITY", 60))
+    # libwebp effort (0-6) for the WebP encoded on the request path; 6 is ~2-3x slower for a few % smaller files
+    INFOGRAPHIC_WEBP_METHOD = int(os.environ.get("INFOGRAPHIC_WEBP_METHOD", 4))
+    # Files of superseded generations stay this long so pages that still reference them keep working
+    INFOGRAPHIC_STALE_GRACE = int(os.environ.get("INFOGRAPHIC_STALE_GRACE", 600))
+    INFOGRAPHIC_RESPONSIVE_WIDTHS = (320, 640, 1024)
+    INFOGRAPHIC_CACHE_MAX_AGE = 31536000  # 1 year; filenames are content-hashed
+
+    # Hedged infographic provider racing (seconds)
+    INFOGRAPHIC_HEDGE_DELAY = float(os.environ.get("INFOGRAPHIC_HEDGE_DELAY", 15))
+    INFOGRAPHIC_HEDGE_MIN_DELAY = float(os.environ.get("INFOGRAPHIC_HEDGE_MIN_DELAY", 3))
+    INFOGRAPHIC_HEDGE_MAX_DELAY = float(os.environ.get("INFOGRAPHIC_HEDGE_MAX_DELAY", 45))
+    INFOGRAPHIC_HEDGE_MIN_SAMPLES = 5
+    INFOGRAPHIC_MIN_SIZE = 256
+    # Starting latency guesses, so Bria (highest quality) goes first until real stats exist
+    INFOGRAPHIC_PRIOR_LATENCIES = {"bria": 15, "pollinations": 20, "huggingface": 25}
+
+    # Record/Replay of external provider calls: off | record | replay | cache
+    REPLAY_MODE = os.environ.get("REPLAY_MODE", "off")
+    REPLAY_DIR = os.environ.get("REPLAY_DIR", os.path.join(os.getcwd(), 'replay_cache'))
+    # Simulated latency for replayed responses: empty, "recorded", or seconds
+    REPLAY_LATENCY = os.environ.get("REPLAY_LATENCY", "")
+
 # Ensure directories exist
 os.makedirs(Config.SESSION_FILE_DIR, exist_ok=True)
 os.makedirs(Config.VECTOR_STORES_DIR, exist_ok=True)
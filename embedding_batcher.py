@@ -0,0 +1,119 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from langchain_core.embeddings import Embeddings
+from config import Config
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model and coalesces concurrent `embed_query` calls into
+    a single batched forward pass.
+
+    Queries are collected until either `max_batch_size` are waiting or the
+    oldest one has waited `max_wait_ms`. Document embedding (ingestion) is
+    already batched, so `embed_documents` goes straight to the wrapped model.
+    """
+
+    def __init__(self, base, max_batch_size=None, max_wait_ms=None):
+        self.base = base
+        self.max_batch_size = max_batch_size or Config.EMBED_BATCH_MAX_SIZE
+        self.max_wait = (Config.EMBED_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "queries": 0,
+            "max_batch_fill": 0,
+            "total_queue_delay": 0.0,
+            "max_queue_delay": 0.0,
+            "total_forward_time": 0.0,
+        }
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        # Threads do not survive fork (e.g. gunicorn --preload), so each process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name="query-embedding-batcher", daemon=True)
+            self._worker.start()
+            self._pid = os.getpid()
+
+    def embed_documents(self, texts):
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, time.time(), future))
+        return future.result()
+
+    def _collect_batch(self, work_queue):
+        batch = [work_queue.get()]
+        deadline = batch[0][1] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(work_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, work_queue):
+        while True:
+            batch = self._collect_batch(work_queue)
+            texts = [text for text, _, _ in batch]
+            started = time.time()
+            try:
+                vectors = self.base.embed_documents(texts)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.time()
+
+            for (_, _, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+            self._record(batch, started, finished)
+
+    def _record(self, batch, started, finished):
+        delays = [started - enqueued for _, enqueued, _ in batch]
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["queries"] += len(batch)
+            self._stats["max_batch_fill"] = max(self._stats["max_batch_fill"], len(batch))
+            self._stats["total_queue_delay"] += sum(delays)
+            self._stats["max_queue_delay"] = max(self._stats["max_queue_delay"], max(delays))
+            self._stats["total_forward_time"] += finished - started
+
+    def stats(self):
+        """
+        Returns batching metrics: batch fill (queries per forward pass relative to
+        the configured maximum) and queueing delay before each forward pass.
+        """
+        with self._stats_lock:
+            s = dict(self._stats)
+        batches = s["batches"] or 1
+        queries = s["queries"] or 1
+        return {
+            "batches": s["batches"],
+            "queries": s["queries"],
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_fill": round(s["queries"] / batches, 2),
+            "avg_batch_fill_ratio": round(s["queries"] / batches / self.max_batch_size, 3),
+            "max_batch_fill": s["max_batch_fill"],
+            "avg_queue_delay_ms": round(s["total_queue_delay"] / queries * 1000, 2),
+            "max_queue_delay_ms": round(s["max_queue_delay"] * 1000, 2),
+            "avg_forward_ms": round(s["total_forward_time"] / batches * 1000, 2),
+        }
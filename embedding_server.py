@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+from langchain_core.embeddings import Embeddings
+from config import Config
+
+_HEADER = struct.Struct("!I")
+
+
+def _send_message(sock, payload):
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def _recv_message(sock):
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+class RemoteEmbeddings(Embeddings):
+    """
+    Client for a local embedding server over a Unix socket. Lets every WSGI worker
+    share one loaded model instead of each holding its own copy.
+    Keeps one persistent connection per thread.
+    """
+
+    def __init__(self, socket_path=None, timeout=60):
+        self.socket_path = socket_path or Config.EMBEDDINGS_SERVER_SOCKET
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None or getattr(self._local, "pid", None) != os.getpid():
+            # A socket inherited across fork belongs to the parent's conversation
+            self._drop_connection()
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+            self._local.pid = os.getpid()
+        return sock
+
+    def _request(self, op, texts=None):
+        payload = {"op": op, "texts": texts or []}
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                _send_message(sock, payload)
+                response = _recv_message(sock)
+                break
+            except (ConnectionError, OSError):
+                # Server restarted or connection went stale: reconnect once
+                self._drop_connection()
+                if attempt:
+                    raise
+        if "error" in response:
+            raise Exception(f"Embedding server error: {response['error']}")
+        return response
+
+    def embed_documents(self, texts):
+        return self._request("embed_documents", list(texts))["embeddings"]
+
+    def embed_query(self, text):
+        return self._request("embed_query", [text])["embeddings"][0]
+
+    def stats(self):
+        """Query batching metrics from the server, or None if batching is disabled there."""
+        return self._request("stats")["stats"]
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        embeddings = self.server.embeddings
+        query_embeddings = self.server.query_embeddings
+        while True:
+            try:
+                message = _recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                if message["op"] == "embed_query":
+                    # Concurrent queries from all workers are batched together here
+                    result = [query_embeddings.embed_query(t) for t in message["texts"]]
+                elif message["op"] == "embed_documents":
+                    result = embeddings.embed_documents(message["texts"])
+                elif message["op"] == "stats":
+                    stats = query_embeddings.stats() if hasattr(query_embeddings, "stats") else None
+                    _send_message(self.request, {"stats": stats})
+                    continue
+                else:
+                    raise ValueError(f"Unknown op '{message['op']}'")
+                _send_message(self.request, {"embeddings": result})
+            except Exception as e:
+                _send_message(self.request, {"error": str(e)})
+
+
+class EmbeddingServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Loads the embedding model once and serves embed requests for all workers
+    on a Unix socket.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path=None):
+        from vector_store_manager import build_embeddings
+        from embedding_batcher import BatchingEmbeddings
+
+        socket_path = socket_path or Config.EMBEDDINGS_SERVER_SOCKET
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        self.embeddings = build_embeddings()
+        self.query_embeddings = BatchingEmbeddings(self.embeddings) if Config.EMBED_BATCHING else self.embeddings
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the embedding model to local workers over a Unix socket.")
+    parser.add_argument("--socket", default=Config.EMBEDDINGS_SERVER_SOCKET or "/tmp/yt_rag_embeddings.sock")
+    args = parser.parse_args()
+
+    server = EmbeddingServer(args.socket)
+    print(f"Embedding server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+import os
+import gc
+
+# Gunicorn settings for production deployments.
+#
+# EMBEDDINGS_SHARE_MODE selects how workers get the embedding model:
+#   - "preload": the app (and the model) is loaded once in the master before fork,
+#                so workers share the weights copy-on-write.
+#   - "server":  workers talk to one embedding_server.py process over
+#                EMBEDDINGS_SERVER_SOCKET instead of loading the model.
+#   - "none":    every worker loads its own copy (previous behaviour).
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 120
+
+share_mode = os.environ.get("EMBEDDINGS_SHARE_MODE", "preload")
+preload_app = share_mode == "preload"
+
+if share_mode == "server":
+    os.environ.setdefault("EMBEDDINGS_SERVER_SOCKET", "/tmp/yt_rag_embeddings.sock")
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Move everything loaded so far out of the GC's reach so collections in the
+        # workers don't touch (and un-share) the model's pages
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Split CPU threads between workers instead of each grabbing every core
+        try:
+            import torch
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+        except ImportError:
+            pass
@@ -0,0 +1,168 @@
+import os
+import json
+import glob
+import time
+import hashlib
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from config import Config
+
+INFOGRAPHICS_URL_PREFIX = "/static/infographics"
+
+# Fallback formats and responsive sizes are encoded off the request path
+_resize_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="infographic-resize")
+
+
+def _encode(image, fmt, **params):
+    buf = BytesIO()
+    image.save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+def _avif_supported():
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+
+def _write(path, data):
+    # Unique per writer, so concurrent saves never clobber each other's temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def manifest_path(video_id, output_dir=None):
+    return os.path.join(output_dir or Config.INFOGRAPHICS_DIR, f"{video_id}_infographic.json")
+
+
+def _write_manifest(manifest, output_dir):
+    _write(manifest_path(manifest["video_id"], output_dir), json.dumps(manifest, indent=2).encode("utf-8"))
+
+
+def _remove_stale(video_id, stem, output_dir):
+    """
+    Removes assets from earlier generations of the same video's infographic once they
+    are older than INFOGRAPHIC_STALE_GRACE, so pages (and concurrent sessions) still
+    referencing a recent generation keep working. Temp files of in-flight writes are skipped.
+    """
+    cutoff = time.time() - Config.INFOGRAPHIC_STALE_GRACE
+    for path in glob.glob(os.path.join(output_dir, f"{video_id}_infographic.*")):
+        name = os.path.basename(path)
+        if name.startswith(stem) or name.endswith((".json", ".tmp")):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _content_hash(image):
+    """Hash of the decoded pixels, so identical images get identical names in every format."""
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()[:12]
+
+
+def save_infographic_assets(image, video_id, output_dir=None):
+    """
+    Saves an infographic as a content-hashed WebP right away, and queues the optimized
+    PNG fallback, AVIF (when Pillow supports it) and responsive sizes in the background.
+    Returns the manifest; the background task fills in the remaining files and byte savings.
+    """
+    output_dir = output_dir or Config.INFOGRAPHICS_DIR
+    os.makedirs(output_dir, exist_ok=True)
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+
+    # Same pixels -> same name, so regenerating an identical image keeps caches valid
+    digest = _content_hash(image)
+    stem = f"{video_id}_infographic.{digest}"
+
+    webp = _encode(image, "WEBP", quality=Config.INFOGRAPHIC_WEBP_QUALITY, method=Config.INFOGRAPHIC_WEBP_METHOD)
+    filename = f"{stem}.webp"
+    _write(os.path.join(output_dir, filename), webp)
+    url = f"{INFOGRAPHICS_URL_PREFIX}/{filename}"
+
+    manifest = {
+        "video_id": video_id,
+        "hash": digest,
+        "width": image.width,
+        "height": image.height,
+        "url": url,
+        "fallback_url": None,
+        "files": {"webp": url},
+        "bytes": {"webp": len(webp)},
+        "bytes_saved": None,
+        "srcset": {}
+    }
+    _write_manifest(manifest, output_dir)
+
+    _resize_pool.submit(_generate_derived_assets, image.copy(), dict(manifest), stem, output_dir)
+    return manifest
+
+
+def _publish(manifest, output_dir, **fields):
+    """Updates the manifest only if this generation is still the current one."""
+    current = load_manifest(manifest["video_id"], output_dir)
+    if current and current["hash"] == manifest["hash"]:
+        current.update(fields)
+        _write_manifest(current, output_dir)
+
+
+def _generate_derived_assets(image, manifest, stem, output_dir):
+    try:
+        files = dict(manifest["files"])
+        sizes = dict(manifest["bytes"])
+        encoded = {"png": _encode(image, "PNG", optimize=True)}
+        if _avif_supported():
+            encoded["avif"] = _encode(image, "AVIF", quality=Config.INFOGRAPHIC_AVIF_QUALITY)
+        for fmt, data in encoded.items():
+            filename = f"{stem}.{fmt}"
+            _write(os.path.join(output_dir, filename), data)
+            files[fmt] = f"{INFOGRAPHICS_URL_PREFIX}/{filename}"
+            sizes[fmt] = len(data)
+
+        png_bytes = sizes["png"]
+        best = min(sizes, key=sizes.get)
+        bytes_saved = png_bytes - sizes[best]
+        _publish(manifest, output_dir, files=files, bytes=sizes, fallback_url=files["png"], bytes_saved=bytes_saved)
+        print(f"Infographic {manifest['video_id']}: PNG {png_bytes} B -> {best.upper()} {sizes[best]} B "
+              f"(saved {bytes_saved} B, {bytes_saved / png_bytes:.0%})")
+    except Exception as e:
+        print(f"Error generating infographic fallback formats: {e}")
+
+    _generate_responsive_sizes(image, manifest, stem, output_dir)
+    _remove_stale(manifest["video_id"], stem, output_dir)
+
+
+def _generate_responsive_sizes(image, manifest, stem, output_dir):
+    try:
+        srcset = {}
+        for width in Config.INFOGRAPHIC_RESPONSIVE_WIDTHS:
+            if width >= image.width:
+                continue
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            filename = f"{stem}.{width}w.webp"
+            _write(
+                os.path.join(output_dir, filename),
+                _encode(resized, "WEBP", quality=Config.INFOGRAPHIC_WEBP_QUALITY, method=6)
+            )
+            srcset[str(width)] = f"{INFOGRAPHICS_URL_PREFIX}/{filename}"
+        srcset[str(image.width)] = manifest["url"]
+        _publish(manifest, output_dir, srcset=srcset)
+    except Exception as e:
+        print(f"Error generating responsive infographic sizes: {e}")
+
+
+def load_manifest(video_id, output_dir=None):
+    path = manifest_path(video_id, output_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,10 +1,29 @@
 import os
-import requests
 from io import BytesIO
 from PIL import Image
 import json
 import time
 from config import Config
+from replay_cache import replay_cache
+from infographic_assets import save_infographic_assets
+
+pollinations_http = replay_cache.session("pollinations")
+
+
+def _read_body(response, cancel_event=None, chunk_size=64 * 1024):
+    """
+    Reads a streamed response body chunk by chunk, giving up as soon as `cancel_event`
+    is set so a losing provider's thread is freed. Returns the bytes, or None if cancelled.
+    """
+    chunks = []
+    try:
+        for chunk in response.iter_content(chunk_size):
+            if cancel_event and cancel_event.is_set():
+                return None
+            chunks.append(chunk)
+    finally:
+        response.close()
+    return b"".join(chunks)
 
 # Alternative: Using Pollinations.ai (Completely Free, No API Key)
 class PollinationsGenerator:
@@ -13,9 +32,10 @@ class PollinationsGenerator:
     """
     
     @staticmethod
-    def generate_infographic(summary_text, style="modern", seed=42):
+    def generate_infographic(summary_text, style="modern", seed=42, cancel_event=None):
         """
         Generates infographic using Pollinations.ai free API.
+        Gives up early if `cancel_event` is set (e.g. another provider already won).
         """
         style_modifiers = {
             "modern": "modern flat design infographic, vibrant colors, clean layout",
@@ -37,22 +57,25 @@ class PollinationsGenerator:
         image_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1024&height=1024&seed={seed}&nologo=true&model=flux"
         
         try:
-            response = requests.get(image_url, timeout=60)
-            if response.status_code == 200:
-                image = Image.open(BytesIO(response.content))
-                return image
-            return None
+            if cancel_event and cancel_event.is_set():
+                return None
+            response = pollinations_http.get(image_url, timeout=60, stream=True)
+            if response.status_code != 200:
+                response.close()
+                return None
+            content = _read_body(response, cancel_event)
+            if content is None:
+                return None
+            image = Image.open(BytesIO(content))
+            return image
         except Exception as e:
             print(f"Error with Pollinations: {str(e)}")
             return None
     
     @staticmethod
-    def save_infographic(image, video_id, output_dir="static/infographics"):
-        """Saves the generated infographic."""
-        os.makedirs(output_dir, exist_ok=True)
-        filepath = os.path.join(output_dir, f"{video_id}_infographic.png")
-        image.save(filepath, "PNG", quality=95)
-        return filepath
+    def save_infographic(image, video_id, output_dir=None):
+        """Saves the generated infographic as web-optimized assets. Returns the asset manifest."""
+        return save_infographic_assets(image, video_id, output_dir)
 
 
 # New: Bria.ai Generator (High Quality)
@@ -67,10 +90,14 @@ class BriaInfographicGenerator:
         self.base_url = "https://engine.prod.bria-api.com/v2"
         # Base model endpoint
         self.endpoint = f"{self.base_url}/text-to-image/base"
+        self.http = replay_cache.session("bria")
+        # Status polls return different results over time, so they replay as a sequence
+        self.poll_http = replay_cache.session("bria", sequence=True)
         
-    def generate_infographic(self, summary_text, infographic_data=None, style="notebooklm"):
+    def generate_infographic(self, summary_text, infographic_data=None, style="notebooklm", cancel_event=None):
         """
         Generates an infographic using Bria.ai.
+        Polling stops early if `cancel_event` is set (e.g. another provider already won).
         """
         if not self.api_token:
             print("Bria API token missing")
@@ -119,7 +146,7 @@ class BriaInfographicGenerator:
 
         try:
             # Bria V2+ is often asynchronous
-            response = requests.post(self.endpoint, headers=headers, json=payload, timeout=30)
+            response = self.http.post(self.endpoint, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -130,14 +157,16 @@ class BriaInfographicGenerator:
                     # Maybe it returned the image directly in sync_mode or different version
                     image_url = data.get("result", {}).get("url")
                     if image_url:
-                        img_res = requests.get(image_url, timeout=30)
+                        img_res = self.http.get(image_url, timeout=30)
                         return Image.open(BytesIO(img_res.content))
                     return None
 
                 # Poll for completion
                 max_retries = 10
                 for _ in range(max_retries):
-                    status_res = requests.get(status_url, headers=headers, timeout=20)
+                    if cancel_event and cancel_event.is_set():
+                        return None
+                    status_res = self.poll_http.get(status_url, headers=headers, timeout=20)
                     if status_res.status_code == 200:
                         status_data = status_res.json()
                         if status_data.get("status") == "completed":
@@ -145,13 +174,16 @@ class BriaInfographicGenerator:
                             image_url = result_data.get("urls", [None])[0] or result_data.get("url")
                             
                             if image_url:
-                                img_res = requests.get(image_url, timeout=30)
+                                img_res = self.http.get(image_url, timeout=30)
                                 return Image.open(BytesIO(img_res.content))
                             break
                         elif status_data.get("status") == "failed":
                             print(f"Bria generation failed: {status_data.get('error')}")
                             break
-                    time.sleep(5)
+                    if cancel_event:
+                        cancel_event.wait(5)
+                    else:
+                        time.sleep(5)
             else:
                 print(f"Bria API error: {response.status_code} - {response.text}")
                 
@@ -160,12 +192,9 @@ class BriaInfographicGenerator:
             print(f"Exception in Bria generator: {str(e)}")
             return None
 
-    def save_infographic(self, image, video_id, output_dir="static/infographics"):
-        """Saves the generated infographic."""
-        os.makedirs(output_dir, exist_ok=True)
-        filepath = os.path.join(output_dir, f"{video_id}_infographic.png")
-        image.save(filepath, "PNG", quality=95, optimize=True)
-        return filepath
+    def save_infographic(self, image, video_id, output_dir=None):
+        """Saves the generated infographic as web-optimized assets. Returns the asset manifest."""
+        return save_infographic_assets(image, video_id, output_dir)
 
     def generate_and_save(self, summary_text, video_id, infographic_data=None, style="notebooklm"):
         """Complete workflow."""
@@ -181,9 +210,13 @@ class HuggingFaceGenerator:
         self.hf_api_key = Config.HUGGINGFACE_API_KEY
         self.api_url = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-xl-base-1.0"
         self.headers = {"Authorization": f"Bearer {self.hf_api_key}"}
+        self.http = replay_cache.session("huggingface")
     
-    def generate_infographic(self, summary_text, style="modern"):
-        """Generates using HuggingFace as fallback."""
+    def generate_infographic(self, summary_text, style="modern", cancel_event=None):
+        """
+        Generates using HuggingFace as fallback.
+        Gives up early if `cancel_event` is set (e.g. another provider already won).
+        """
         style_prompts = {
             "modern": "modern flat design, vibrant colors",
             "minimalist": "minimalist design, clean typography",
@@ -207,10 +240,16 @@ class HuggingFaceGenerator:
         }
         
         try:
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=60)
-            if response.status_code == 200:
-                return Image.open(BytesIO(response.content))
-            return None
+            if cancel_event and cancel_event.is_set():
+                return None
+            response = self.http.post(self.api_url, headers=self.headers, json=payload, timeout=60, stream=True)
+            if response.status_code != 200:
+                response.close()
+                return None
+            content = _read_body(response, cancel_event)
+            if content is None:
+                return None
+            return Image.open(BytesIO(content))
         except Exception as e:
             print(f"HuggingFace error: {str(e)}")
             return None
\ No newline at end of file
@@ -1,6 +1,7 @@
 import os
 from google import genai
 from dotenv import load_dotenv
+from replay_cache import replay_cache
 
 load_dotenv()
 
@@ -33,11 +34,15 @@ class GeminiMindMapGenerator:
         """
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_id,
-                contents=prompt
+            response_text = replay_cache.call(
+                "gemini",
+                {"model": self.model_id, "contents": prompt},
+                lambda: self.client.models.generate_content(
+                    model=self.model_id,
+                    contents=prompt
+                ).text
             )
-            mindmap_code = response.text.strip()
+            mindmap_code = response_text.strip()
             
             # Clean up if Gemini included markdown fences despite instructions
             if mindmap_code.startswith("```"):
@@ -0,0 +1,107 @@
+import os
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config import Config
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Runs a sentence-transformers model (mean pooling, no normalization) with ONNX Runtime
+    on CPU, optionally with dynamic int8 weight quantization.
+
+    The model is exported once to Config.ONNX_MODELS_DIR and reused afterwards.
+    Requires `onnxruntime`, `onnx` and `transformers` (plus torch for the one-off export).
+    """
+
+    def __init__(self, model_name, quantize=False, batch_size=32, max_length=256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        model_path = self._ensure_model()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if Config.ONNX_NUM_THREADS:
+            options.intra_op_num_threads = Config.ONNX_NUM_THREADS
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _ensure_model(self):
+        """
+        Exports the model to ONNX (and quantizes it) if not already on disk.
+        Returns the path of the model to load.
+        """
+        model_dir = os.path.join(Config.ONNX_MODELS_DIR, self.model_name.replace("/", "__"))
+        fp32_path = os.path.join(model_dir, "model.onnx")
+        int8_path = os.path.join(model_dir, "model.int8.onnx")
+
+        if not os.path.exists(fp32_path):
+            os.makedirs(model_dir, exist_ok=True)
+            self._export(fp32_path)
+
+        if not self.quantize:
+            return fp32_path
+
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            # Per-process temp name, so concurrent workers never load a half-written file
+            tmp_path = f"{int8_path}.{os.getpid()}.tmp"
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+    def _export(self, output_path):
+        import torch
+        from transformers import AutoModel
+
+        model = AutoModel.from_pretrained(self.model_name)
+        model.eval()
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask", "token_type_ids"]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+                tmp_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        os.replace(tmp_path, output_path)
+
+    def _encode(self, texts):
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np",
+        )
+        inputs = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+        last_hidden_state = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real tokens, matching sentence-transformers
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        summed = (last_hidden_state * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return summed / counts
+
+    def embed_documents(self, texts):
+        texts = [t.replace("\n", " ") for t in texts]
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
@@ -0,0 +1,155 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+
+
+class ProviderStats:
+    """
+    Rolling latency and success statistics for one image provider.
+    """
+
+    def __init__(self, name, prior_latency):
+        self.name = name
+        self.prior_latency = prior_latency
+        self.latencies = deque(maxlen=50)
+        self.outcomes = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def record(self, latency, success):
+        """
+        Records an attempt. `success=None` marks an attempt cancelled before it finished:
+        its elapsed time is kept as a latency lower bound but not counted as an outcome.
+        """
+        with self._lock:
+            if success is not None:
+                self.outcomes.append(success)
+            if success or success is None:
+                self.latencies.append(latency)
+
+    def success_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 1.0
+            return sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, percentile):
+        with self._lock:
+            if len(self.latencies) < Config.INFOGRAPHIC_HEDGE_MIN_SAMPLES:
+                return self.prior_latency
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(percentile * len(ordered)))]
+
+    def expected_time(self):
+        """Expected seconds to a usable result, penalizing unreliable providers."""
+        return self.latency_percentile(0.5) / max(self.success_rate(), 0.05)
+
+    def to_dict(self):
+        with self._lock:
+            attempts = len(self.outcomes)
+            latencies = list(self.latencies)
+        return {
+            "attempts": attempts,
+            "success_rate": round(self.success_rate(), 3),
+            "median_latency": round(self.latency_percentile(0.5), 2),
+            "p75_latency": round(self.latency_percentile(0.75), 2),
+            "samples": len(latencies),
+            "expected_time": round(self.expected_time(), 2)
+        }
+
+
+class InfographicOrchestrator:
+    """
+    Races image providers with hedging: the provider expected to be fastest starts
+    first; if it hasn't produced an acceptable image within its hedge delay (its p75
+    latency, once there is enough history), the next one starts too. The first
+    acceptable image wins and the others are cancelled.
+
+    `providers` maps a name to a callable (summary, infographic_data, style, cancel_event)
+    returning a PIL image or None. `prior_latencies` seeds the ranking before stats exist.
+    """
+
+    def __init__(self, providers, prior_latencies=None):
+        self.providers = providers
+        prior_latencies = prior_latencies or {}
+        self.stats = {
+            name: ProviderStats(name, prior_latencies.get(name, Config.INFOGRAPHIC_HEDGE_DELAY))
+            for name in providers
+        }
+
+    def ranked(self, candidates=None):
+        """Names of `candidates` (default: all providers) ordered by expected time to success."""
+        names = [name for name in self.providers if candidates is None or name in candidates]
+        return sorted(names, key=lambda name: self.stats[name].expected_time())
+
+    def hedge_delay(self, name):
+        delay = self.stats[name].latency_percentile(0.75)
+        return min(max(delay, Config.INFOGRAPHIC_HEDGE_MIN_DELAY), Config.INFOGRAPHIC_HEDGE_MAX_DELAY)
+
+    @staticmethod
+    def is_acceptable(image):
+        return image is not None and min(image.size) >= Config.INFOGRAPHIC_MIN_SIZE
+
+    def _attempt(self, name, cancel_event, args):
+        started = time.time()
+        try:
+            image = self.providers[name](*args, cancel_event)
+        except Exception as e:
+            print(f"{name} failed: {str(e)}")
+            image = None
+        ok = self.is_acceptable(image)
+        if not ok and cancel_event.is_set():
+            # Cut short by a faster provider: only tells us it is at least this slow
+            self.stats[name].record(time.time() - started, None)
+        else:
+            self.stats[name].record(time.time() - started, ok)
+        return image if ok else None
+
+    def generate(self, summary, infographic_data=None, style="notebooklm", candidates=None):
+        """
+        Races `candidates` (default: all providers), returning (provider_name, image) for
+        the first acceptable result, or (None, None) if every provider failed.
+        """
+        queue = self.ranked(candidates)
+        if not queue:
+            return None, None
+        cancel_event = threading.Event()
+        args = (summary, infographic_data, style)
+        pool = ThreadPoolExecutor(max_workers=len(queue), thread_name_prefix="infographic-provider")
+        running = {}
+
+        def launch():
+            name = queue.pop(0)
+            print(f"Starting infographic provider: {name}")
+            running[pool.submit(self._attempt, name, cancel_event, args)] = name
+            return time.time() + self.hedge_delay(name)
+
+        try:
+            next_hedge_at = launch()
+            while running:
+                timeout = max(0, next_hedge_at - time.time()) if queue else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Primary is slow: hedge with the next provider
+                    next_hedge_at = launch()
+                    continue
+
+                for future in done:
+                    name = running.pop(future)
+                    image = future.result()
+                    if image is not None:
+                        cancel_event.set()
+                        return name, image
+
+                # A provider failed outright; don't wait out the hedge delay
+                if queue:
+                    next_hedge_at = launch()
+            return None, None
+        finally:
+            cancel_event.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
@@ -1,17 +1,26 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableParallel, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from config import Config
+from replay_cache import replay_cache
+
+def format_docs(retrieved_docs):
+    return "\n\n".join(doc.page_content for doc in retrieved_docs)
 
 class RAGEngine:
     def __init__(self):
-        self.llm = ChatGroq(
-            groq_api_key=Config.GROQ_API_KEY,
-            model_name=Config.LLM_MODEL,
-            temperature=0.2
+        self.llm = replay_cache.wrap_llm(
+            "groq",
+            ChatGroq(
+                groq_api_key=Config.GROQ_API_KEY,
+                model_name=Config.LLM_MODEL,
+                temperature=0.2
+            ),
+            Config.LLM_MODEL
         )
         self.prompt = PromptTemplate(
             template="""
@@ -33,9 +42,6 @@ class RAGEngine:
         Runs the RAG chain and returns the answer.
         """
         retriever = vector_store.as_retriever(search_type="similarity", search_kwargs={"k": 4})
-        
-        def format_docs(retrieved_docs):
-            return "\n\n".join(doc.page_content for doc in retrieved_docs)
 
         chain = (
             RunnableParallel({
@@ -49,6 +55,43 @@ class RAGEngine:
         
         return chain.invoke(question)
 
+    def iter_answers(self, vector_store, questions, max_concurrency=None):
+        """
+        Answers several questions against one loaded vector store.
+        All questions are embedded in a single forward pass, retrieval runs per question,
+        and LLM calls are dispatched concurrently (at most `max_concurrency` at once).
+        Yields (index, answer, error) tuples as each answer completes.
+        """
+        embeddings = vector_store.embeddings
+        if embeddings is not None:
+            vectors = embeddings.embed_documents(questions)
+        else:
+            vectors = [vector_store.embedding_function(q) for q in questions]
+
+        prompts = []
+        for question, vector in zip(questions, vectors):
+            docs = vector_store.similarity_search_by_vector(vector, k=4)
+            prompts.append(self.prompt.invoke({"context": format_docs(docs), "question": question}))
+
+        answer_chain = self.llm | self.parser
+        max_workers = max(1, min(max_concurrency or Config.BATCH_QA_MAX_CONCURRENCY, len(prompts)))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(answer_chain.invoke, prompt): i for i, prompt in enumerate(prompts)}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, str(e)
+
+    def get_answers(self, vector_store, questions, max_concurrency=None):
+        """
+        Answers several questions and returns results in the order asked.
+        """
+        results = [None] * len(questions)
+        for index, answer, error in self.iter_answers(vector_store, questions, max_concurrency):
+            results[index] = {"question": questions[index], "answer": answer, "error": error}
+        return results
+
     def get_infographic_details(self, vector_store):
         """
         Extracts structured details (title, themes, interface) for infographic generation.
@@ -73,9 +116,6 @@ class RAGEngine:
             input_variables=['context']
         )
 
-        def format_docs(retrieved_docs):
-            return "\n\n".join(doc.page_content for doc in retrieved_docs)
-
         chain = (
             {"context": retriever | RunnableLambda(format_docs)}
             | extraction_prompt
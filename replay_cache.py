@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+
+class ReplayMissError(Exception):
+    """Raised in replay mode when no recording exists for a request."""
+
+
+class ReplayCache:
+    """
+    Record/replay layer for external provider calls (Groq, Gemini, Bria,
+    Pollinations, HuggingFace).
+
+    Modes (Config.REPLAY_MODE):
+      - "off":    calls go straight to the network (default).
+      - "record": every call goes to the network and is written to disk.
+      - "replay": calls are served from disk only; a miss raises ReplayMissError.
+      - "cache":  read-through cache; served from disk when recorded,
+                  otherwise fetched live and recorded.
+
+    A fingerprint normally maps to one response. Polling endpoints (e.g. Bria
+    status URLs) are marked as sequences instead and replay in the order they
+    were recorded; once a sequence is exhausted its last response repeats.
+    In cache mode, non-2xx HTTP responses are never stored.
+    """
+
+    MODES = ("off", "record", "replay", "cache")
+
+    def __init__(self, mode=None, cache_dir=None, latency=None):
+        self.mode = (mode or Config.REPLAY_MODE).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown replay mode '{self.mode}', expected one of {self.MODES}")
+        self.cache_dir = cache_dir or Config.REPLAY_DIR
+        self.latency = Config.REPLAY_LATENCY if latency is None else latency
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._live_keys = set()
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @staticmethod
+    def fingerprint(provider, request_data):
+        """Stable hash of a provider name and a JSON-serializable request description."""
+        canonical = json.dumps(request_data, sort_keys=True, default=str)
+        return hashlib.sha256(f"{provider}:{canonical}".encode("utf-8")).hexdigest()
+
+    def _path(self, provider, key):
+        return os.path.join(self.cache_dir, provider, f"{key}.json")
+
+    def _load(self, provider, key):
+        # A missing, unreadable or corrupt recording is a miss, not an error
+        try:
+            with open(self._path(provider, key), "r", encoding="utf-8") as f:
+                return json.load(f).get("responses", [])
+        except (OSError, ValueError):
+            return []
+
+    def _store(self, provider, key, request_data, responses):
+        path = self._path(provider, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per writer, so workers recording the same request never share a temp file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"provider": provider, "request": request_data, "responses": responses}, f, default=str)
+        os.replace(tmp_path, path)
+
+    def _simulate_latency(self, entry):
+        if not self.latency:
+            return
+        if self.latency == "recorded":
+            delay = entry.get("elapsed", 0)
+        else:
+            delay = float(self.latency)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _lookup(self, provider, key, sequence):
+        """
+        Returns the recorded response to serve for a fingerprint, or None to go to the network.
+        Plain requests always serve their recorded response. Sequences (polling) replay in
+        order; while a sequence is still being recorded in this run it goes back to the
+        network, otherwise its last response repeats.
+        """
+        with self._lock:
+            responses = self._load(provider, key)
+            if not responses:
+                return None
+            if not sequence:
+                return responses[-1]
+            cursor = self._cursors.get(key, 0)
+            if cursor < len(responses):
+                self._cursors[key] = cursor + 1
+                return responses[cursor]
+            if self.mode == "replay" or key not in self._live_keys:
+                return responses[-1]
+        return None
+
+    def _record(self, provider, key, request_data, payload, elapsed, sequence):
+        with self._lock:
+            if sequence and (self.mode == "cache" or key in self._live_keys):
+                responses = self._load(provider, key)
+            else:
+                # Plain requests keep one response; a fresh recording run replaces stale sequences
+                responses = []
+            self._live_keys.add(key)
+            responses.append({"payload": payload, "elapsed": round(elapsed, 4)})
+            self._store(provider, key, request_data, responses)
+            self._cursors[key] = len(responses)
+
+    def call(self, provider, request_data, fetch, sequence=False, cacheable=None):
+        """
+        Runs `fetch()` through the record/replay layer.
+        `fetch` must return a JSON-serializable payload. `sequence=True` marks requests
+        whose response changes on repeat (e.g. status polls). In cache mode, payloads
+        rejected by `cacheable(payload)` are returned but not stored.
+        """
+        if not self.enabled:
+            return fetch()
+
+        key = self.fingerprint(provider, request_data)
+
+        if self.mode in ("replay", "cache"):
+            entry = self._lookup(provider, key, sequence)
+            if entry is not None:
+                self._simulate_latency(entry)
+                return entry["payload"]
+            if self.mode == "replay":
+                raise ReplayMissError(f"No recording for {provider} request {key[:12]}")
+
+        start = time.time()
+        payload = fetch()
+        if self.mode == "cache" and cacheable and not cacheable(payload):
+            return payload
+        try:
+            self._record(provider, key, request_data, payload, time.time() - start, sequence)
+        except Exception as e:
+            # The live call succeeded; a failed recording shouldn't fail it
+            print(f"Failed to record {provider} request {key[:12]}: {e}")
+        return payload
+
+    def wrap_llm(self, provider, llm, model_name):
+        """
+        Wraps a LangChain chat model so prompt -> message calls go through the cache.
+        Only the message content is recorded.
+        """
+        if not self.enabled:
+            return llm
+
+        from langchain_core.messages import AIMessage
+        from langchain_core.runnables import RunnableLambda
+
+        def invoke(prompt_value):
+            prompt_text = prompt_value.to_string() if hasattr(prompt_value, "to_string") else str(prompt_value)
+            content = self.call(
+                provider,
+                {"model": model_name, "prompt": prompt_text},
+                lambda: llm.invoke(prompt_value).content
+            )
+            return AIMessage(content=content)
+
+        return RunnableLambda(invoke)
+
+    def session(self, provider, sequence=False):
+        """
+        Returns a requests.Session whose HTTP(S) traffic goes through the cache.
+        Use `sequence=True` for sessions that poll the same URL for changing results.
+        """
+        session = requests.Session()
+        if self.enabled:
+            adapter = ReplayAdapter(self, provider, sequence)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Transport adapter for requests that records and replays raw HTTP responses.
+    Fingerprints use method, URL and body only, so API tokens in headers are never stored.
+    """
+
+    def __init__(self, cache, provider, sequence=False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.provider = provider
+        self.sequence = sequence
+
+    def send(self, request, **kwargs):
+        body = request.body
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+
+        request_data = {"method": request.method, "url": request.url, "body": body}
+
+        def fetch():
+            response = super(ReplayAdapter, self).send(request, **kwargs)
+            return {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "content": base64.b64encode(response.content).decode("ascii"),
+            }
+
+        payload = self.cache.call(
+            self.provider, request_data, fetch,
+            sequence=self.sequence,
+            cacheable=lambda p: 200 <= p["status_code"] < 300
+        )
+        return self._build_response(request, payload)
+
+    @staticmethod
+    def _build_response(request, payload):
+        response = requests.Response()
+        response.status_code = payload["status_code"]
+        response.headers.update(payload.get("headers", {}))
+        # Content is stored decoded, so drop transfer encodings that no longer apply
+        response.headers.pop("Content-Encoding", None)
+        response.headers.pop("Transfer-Encoding", None)
+        response._content = base64.b64decode(payload["content"])
+        # Streamed reads (iter_content) are served from the replayed body
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+replay_cache = ReplayCache()
@@ -0,0 +1,110 @@
+import os
+import json
+import gzip
+import time
+import threading
+from concurrent.futures import Future
+from config import Config
+
+
+class CachedFailure(Exception):
+    """Raised when a negatively cached failure is served instead of refetching."""
+
+
+class TranscriptCache:
+    """
+    Gzip-compressed on-disk cache for transcripts and metadata, keyed by
+    (kind, video_id, language), with TTLs.
+
+    Permanent-looking failures (transcripts disabled, invalid IDs) are cached
+    negatively for a short time so they don't hit YouTube again. Concurrent
+    fetches of the same key are coalesced into one upstream request.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or Config.TRANSCRIPT_CACHE_DIR
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _path(self, kind, video_id, language):
+        suffix = f"_{language}" if language else ""
+        return os.path.join(self.cache_dir, kind, f"{video_id}{suffix}.json.gz")
+
+    def _read(self, path):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            return None
+        return entry
+
+    def _write(self, path, entry):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def _try_write(self, path, entry):
+        """Writes an entry, logging failures: an unwritable cache must not fail the fetch."""
+        try:
+            self._write(path, entry)
+        except Exception as e:
+            print(f"Failed to write cache entry {path}: {e}")
+
+    def get_or_fetch(self, kind, video_id, fetch, ttl, language=None, negative_ttl=None,
+                     negative_errors=(), describe=str):
+        """
+        Returns the cached value for the key, or calls `fetch()` once (even under
+        concurrent callers) and caches its result for `ttl` seconds.
+        Exceptions in `negative_errors` are cached for `negative_ttl` seconds as
+        `describe(error)` and re-raised as CachedFailure on later hits.
+        """
+        path = self._path(kind, video_id, language)
+        entry = self._read(path)
+        if entry is not None:
+            if entry["ok"]:
+                return entry["value"]
+            raise CachedFailure(entry["error"])
+
+        key = (kind, video_id, language)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            # Another leader may have just finished and written the entry
+            entry = self._read(path)
+            if entry is not None:
+                if not entry["ok"]:
+                    raise CachedFailure(entry["error"])
+                future.set_result(entry["value"])
+                return entry["value"]
+
+            value = fetch()
+            # Resolve followers first; the write can't leave them waiting
+            future.set_result(value)
+            self._try_write(path, {"ok": True, "value": value, "expires_at": time.time() + ttl})
+            return value
+        except negative_errors as e:
+            future.set_exception(e)
+            negative_ttl = Config.NEGATIVE_CACHE_TTL if negative_ttl is None else negative_ttl
+            self._try_write(path, {"ok": False, "error": describe(e), "expires_at": time.time() + negative_ttl})
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+transcript_cache = TranscriptCache()
@@ -1,6 +1,14 @@
 import re
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
+from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, InvalidVideoId
 import requests
+from config import Config
+from transcript_cache import transcript_cache, CachedFailure
+
+# Failures that won't change on an immediate retry, so they are cached negatively
+NEGATIVE_TRANSCRIPT_ERRORS = (TranscriptsDisabled, NoTranscriptFound, VideoUnavailable, InvalidVideoId)
+
+class MetadataNotFound(Exception):
+    pass
 
 class TranscriptProcessor:
     @staticmethod
@@ -26,66 +34,108 @@ class TranscriptProcessor:
         return None
 
     @staticmethod
-    def get_transcript(video_id):
+    def get_transcript(video_id, languages=("en",)):
+        """
+        Fetches the transcript for a given video ID, preferring `languages` in order but falling back to any available language.
+        Results are served from the local transcript cache when available.
+        """
+        return TranscriptProcessor.get_transcript_with_language(video_id, languages)["text"]
+
+    @staticmethod
+    def get_transcript_with_language(video_id, languages=("en",)):
+        """
+        Like get_transcript, but returns {"text", "language"} with the language code actually served.
+        Cache entries are keyed on the preference list, since the fallback makes it decide the result.
+        """
+        languages = list(languages)
+        try:
+            entry = transcript_cache.get_or_fetch(
+                "transcript", video_id,
+                lambda: TranscriptProcessor._fetch_transcript(video_id, languages),
+                ttl=Config.TRANSCRIPT_CACHE_TTL,
+                language=",".join(languages),
+                negative_errors=NEGATIVE_TRANSCRIPT_ERRORS,
+                describe=TranscriptProcessor._describe_error
+            )
+        except CachedFailure:
+            raise
+        except Exception as e:
+            raise Exception(TranscriptProcessor._describe_error(e))
+        if isinstance(entry, str):
+            # Cached before the served language was recorded
+            return {"text": entry, "language": None}
+        return entry
+
+    @staticmethod
+    def _describe_error(error):
+        if isinstance(error, TranscriptsDisabled):
+            return "Transcripts are disabled for this video."
+        return f"Error fetching transcript: {str(error)}"
+
+    @staticmethod
+    def _fetch_transcript(video_id, languages):
         """
-        Fetches the transcript for a given video ID, preferring English but falling back to any available language.
+        Fetches the transcript from YouTube, returning its text and language code.
         Uses cookies.txt if available to bypass IP limits.
         """
         import os
         cookies_path = os.path.join(os.getcwd(), 'cookies.txt')
         cookies = cookies_path if os.path.exists(cookies_path) else None
         
+        # Correct instance-based usage for this version
+        api = YouTubeTranscriptApi()
+        
+        if cookies:
+            print(f"Using cookies from {cookies_path}")
+            transcript_list = api.list(video_id, cookies=cookies)
+        else:
+            transcript_list = api.list(video_id)
+        
         try:
-            # Correct instance-based usage for this version
-            api = YouTubeTranscriptApi()
-            
-            if cookies:
-                print(f"Using cookies from {cookies_path}")
-                transcript_list = api.list(video_id, cookies=cookies)
-            else:
-                transcript_list = api.list(video_id)
+            # Try the preferred languages first (manual or generated)
+            transcript_data = transcript_list.find_transcript(languages)
+        except:
+            # If none is found, get the first available transcript
+            # This will catch Hindi, Spanish, etc.
+            transcript_data = next(iter(transcript_list))
             
-            try:
-                # Try to get English transcript first (manual or generated)
-                transcript_data = transcript_list.find_transcript(['en'])
-            except:
-                # If English not found, get the first available transcript
-                # This will catch Hindi, Spanish, etc.
-                transcript_data = next(iter(transcript_list))
-                
-            fetched_transcript = transcript_data.fetch()
-            # fetched_transcript is a list of snippet objects (or dicts)
-            # Use a safe way to extract text that doesn't evaluate the default branch
-            return " ".join([t.text if hasattr(t, 'text') else t['text'] for t in fetched_transcript])
-            
-        except TranscriptsDisabled:
-            raise Exception("Transcripts are disabled for this video.")
-        except Exception as e:
-            raise Exception(f"Error fetching transcript: {str(e)}")
+        fetched_transcript = transcript_data.fetch()
+        # fetched_transcript is a list of snippet objects (or dicts)
+        # Use a safe way to extract text that doesn't evaluate the default branch
+        text = " ".join([t.text if hasattr(t, 'text') else t['text'] for t in fetched_transcript])
+        return {"text": text, "language": transcript_data.language_code}
 
     @staticmethod
     def get_metadata(video_id):
         """
-        Fetches video metadata (title, thumbnail) using oEmbed.
+        Fetches video metadata (title, thumbnail) using oEmbed, through the local cache.
         """
         try:
-            oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-            response = requests.get(oembed_url)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "title": data.get("title"),
-                    "thumbnail": data.get("thumbnail_url"),
-                    "author": data.get("author_name")
-                }
+            return transcript_cache.get_or_fetch(
+                "metadata", video_id,
+                lambda: TranscriptProcessor._fetch_metadata(video_id),
+                ttl=Config.METADATA_CACHE_TTL,
+                negative_errors=(MetadataNotFound,)
+            )
+        except Exception:
             return {
                 "title": f"Video {video_id}",
                 "thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
                 "author": "Unknown"
             }
-        except Exception:
+
+    @staticmethod
+    def _fetch_metadata(video_id):
+        oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
+        response = requests.get(oembed_url, timeout=10)
+        if response.status_code == 200:
+            data = response.json()
             return {
-                "title": f"Video {video_id}",
-                "thumbnail": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
-                "author": "Unknown"
+                "title": data.get("title"),
+                "thumbnail": data.get("thumbnail_url"),
+                "author": data.get("author_name")
             }
+        if response.status_code in (400, 401, 403, 404):
+            # Invalid, private or removed video
+            raise MetadataNotFound(f"oEmbed returned {response.status_code}")
+        raise Exception(f"oEmbed returned {response.status_code}")
@@ -1,43 +1,329 @@
 import os
+import json
+import math
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from config import Config
+from embedding_batcher import BatchingEmbeddings
+
+def build_embeddings(backend=None):
+    """
+    Builds the document embedder for the configured backend: "torch" (default),
+    "onnx" or "onnx-int8". Falls back to PyTorch if ONNX Runtime is unavailable.
+    """
+    backend = (backend or Config.EMBEDDINGS_BACKEND).lower()
+    if backend in ("onnx", "onnx-int8"):
+        try:
+            from onnx_embeddings import OnnxEmbeddings
+            return OnnxEmbeddings(Config.EMBEDDINGS_MODEL, quantize=backend == "onnx-int8")
+        except Exception as e:
+            print(f"ONNX embedding backend unavailable, falling back to PyTorch: {e}")
+
+    return HuggingFaceEmbeddings(
+        model_name=Config.EMBEDDINGS_MODEL,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': False}
+    )
+
+def save_index(vector_store, path):
+    """
+    Saves a FAISS store so readers in other processes never load a torn index.
+    Files are written to a temp dir, then moved into place mapping first (index.pkl),
+    vectors last (index.faiss): an appended-to index is never read with vectors
+    that have no docstore entry.
+    """
+    os.makedirs(path, exist_ok=True)
+    tmp_dir = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        vector_store.save_local(tmp_dir)
+        for name in ("index.pkl", "index.faiss"):
+            os.replace(os.path.join(tmp_dir, name), os.path.join(path, name))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+class LiveFAISS(FAISS):
+    """
+    FAISS store that can be searched while ingestion is still appending chunks to it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+
+    def add_embeddings(self, *args, **kwargs):
+        with self._lock:
+            return super().add_embeddings(*args, **kwargs)
+
+    def similarity_search_with_score_by_vector(self, *args, **kwargs):
+        with self._lock:
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+
+    def save_local(self, *args, **kwargs):
+        with self._lock:
+            return super().save_local(*args, **kwargs)
+
+class IngestionJob:
+    """
+    Tracks a progressive ingestion: the live index and how much of the transcript it covers.
+    """
+
+    def __init__(self, session_id, total_chunks):
+        self.session_id = session_id
+        self.job_id = uuid.uuid4().hex
+        self.total_chunks = total_chunks
+        self.indexed_chunks = 0
+        self.vector_store = None
+        self.complete = False
+        self.error = None
+        self.cancelled = threading.Event()
+
+    def status(self):
+        coverage = self.indexed_chunks / self.total_chunks if self.total_chunks else 1.0
+        return {
+            "indexed_chunks": self.indexed_chunks,
+            "total_chunks": self.total_chunks,
+            "coverage": round(coverage, 3),
+            "complete": self.complete,
+            "message": f"indexed {int(coverage * 100)}% of transcript",
+            "error": self.error
+        }
 
 class VectorStoreManager:
     def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=Config.EMBEDDINGS_MODEL,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': False}
-        )
+        if Config.EMBEDDINGS_SERVER_SOCKET:
+            # Shared model served by embedding_server.py; it batches queries itself
+            from embedding_server import RemoteEmbeddings
+            self.embeddings = RemoteEmbeddings(Config.EMBEDDINGS_SERVER_SOCKET)
+            self.query_embeddings = self.embeddings
+        else:
+            self.embeddings = build_embeddings()
+            # Query-time embeddings; concurrent questions share one forward pass
+            self.query_embeddings = BatchingEmbeddings(self.embeddings) if Config.EMBED_BATCHING else self.embeddings
         self.splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._ingestion_pool = ThreadPoolExecutor(max_workers=Config.INGESTION_WORKERS, thread_name_prefix="ingestion")
 
-    def create_vector_store(self, transcript, session_id):
+    def _path(self, session_id):
+        return os.path.join(Config.VECTOR_STORES_DIR, f"vs_{session_id}")
+
+    def _video_path(self, video_id):
+        return os.path.join(Config.VECTOR_STORES_DIR, f"video_{video_id}")
+
+    def _status_path(self, session_id):
+        return os.path.join(self._path(session_id), "status.json")
+
+    def _write_status(self, job):
+        status = dict(job.status(), job_id=job.job_id)
+        os.makedirs(self._path(job.session_id), exist_ok=True)
+        path = self._status_path(job.session_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(status, f)
+        os.replace(tmp_path, path)
+
+    def _read_status(self, session_id):
+        try:
+            with open(self._status_path(session_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _persist(self, job):
         """
-        Splits transcript and creates a FAISS vector store saved locally per session.
+        Saves the partial index and its coverage so any worker can serve the session.
+        Returns False if the session was deleted or re-indexed elsewhere meanwhile.
         """
+        status = self._read_status(job.session_id)
+        if status is None or status.get("job_id") != job.job_id:
+            return False
+        if job.vector_store is not None:
+            save_index(job.vector_store, self._path(job.session_id))
+        self._write_status(job)
+        return True
+
+    def _build_and_save(self, transcript, path):
         chunks = self.splitter.create_documents([transcript])
         vector_store = FAISS.from_documents(chunks, self.embeddings)
-        
-        path = os.path.join(Config.VECTOR_STORES_DIR, f"vs_{session_id}")
-        vector_store.save_local(path)
+        # Built in a temp dir and moved into place, so a half-written store is never visible
+        save_index(vector_store, path)
+        return len(chunks)
+
+    def create_vector_store(self, transcript, session_id):
+        """
+        Splits transcript and creates a FAISS vector store saved locally per session.
+        """
+        path = self._path(session_id)
+        self._build_and_save(transcript, path)
+        # A finished index supersedes any progressive-indexing status left in the directory
+        if os.path.exists(self._status_path(session_id)):
+            os.remove(self._status_path(session_id))
         return path
 
+    def create_video_store(self, transcript, video_id):
+        """
+        Builds a shared, pre-ingested vector store for a video (used by bulk ingestion).
+        Returns the number of chunks indexed.
+        """
+        return self._build_and_save(transcript, self._video_path(video_id))
+
+    def has_video_store(self, video_id):
+        # index.faiss is moved into place last, so its presence means the store is complete
+        return os.path.exists(os.path.join(self._video_path(video_id), "index.faiss"))
+
+    def copy_video_store(self, video_id, session_id):
+        """
+        Gives a session its own copy of a pre-ingested video store, skipping embedding.
+        """
+        self.delete_vector_store(session_id)
+        shutil.copytree(self._video_path(video_id), self._path(session_id))
+        return self._path(session_id)
+
+    def start_progressive_index(self, transcript, session_id):
+        """
+        Embeds the first batch of chunks right away and the rest in the background,
+        so the index is searchable within seconds regardless of video length.
+        Chunks are queued in a strided order so the early partial index already
+        spans the whole video. The partial index is saved to disk after the first
+        batch and every PROGRESSIVE_SAVE_EVERY batches, along with a status file,
+        so other worker processes can search it and report its coverage.
+        Returns the job status.
+        """
+        chunks = self.splitter.create_documents([transcript])
+        step = max(1, math.ceil(len(chunks) / Config.PROGRESSIVE_FIRST_BATCH))
+        ordered = [chunks[i] for offset in range(step) for i in range(offset, len(chunks), step)]
+
+        first = ordered[:Config.PROGRESSIVE_FIRST_BATCH]
+        rest = ordered[Config.PROGRESSIVE_FIRST_BATCH:]
+        batches = [rest[i:i + Config.PROGRESSIVE_BATCH_SIZE] for i in range(0, len(rest), Config.PROGRESSIVE_BATCH_SIZE)]
+
+        job = IngestionJob(session_id, len(ordered))
+        with self._jobs_lock:
+            previous = self._jobs.get(session_id)
+            if previous:
+                previous.cancelled.set()
+            self._jobs[session_id] = job
+
+        try:
+            # Start from a clean directory so stale files never mix with the new index
+            shutil.rmtree(self._path(session_id), ignore_errors=True)
+            self._index_batch(job, first)
+            if job.vector_store is not None:
+                save_index(job.vector_store, self._path(session_id))
+            self._write_status(job)
+        except Exception:
+            self._drop_job(job)
+            raise
+
+        self._ingestion_pool.submit(self._run_ingestion, job, batches)
+        return job.status()
+
+    def _index_batch(self, job, batch):
+        if not batch:
+            return
+        texts = [doc.page_content for doc in batch]
+        metadatas = [doc.metadata for doc in batch]
+        vectors = self.embeddings.embed_documents(texts)
+
+        if job.vector_store is None:
+            job.vector_store = LiveFAISS.from_embeddings(
+                list(zip(texts, vectors)), self.query_embeddings, metadatas=metadatas
+            )
+        else:
+            job.vector_store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        job.indexed_chunks += len(batch)
+
+    def _run_ingestion(self, job, batches):
+        try:
+            for number, batch in enumerate(batches, 1):
+                if job.cancelled.is_set():
+                    return
+                self._index_batch(job, batch)
+                if number % Config.PROGRESSIVE_SAVE_EVERY == 0 and number < len(batches):
+                    if not self._persist(job):
+                        job.cancelled.set()
+                        self._drop_job(job)
+                        return
+
+            if job.cancelled.is_set():
+                return
+            job.complete = True
+            self._persist(job)
+            # Once saved, the on-disk index is the source of truth
+            self._drop_job(job)
+        except Exception as e:
+            print(f"Progressive indexing failed for session {job.session_id}: {e}")
+            job.error = str(e)
+            status = self._read_status(job.session_id)
+            if status and status.get("job_id") == job.job_id:
+                self._write_status(job)
+
+    def _drop_job(self, job):
+        with self._jobs_lock:
+            if self._jobs.get(job.session_id) is job:
+                del self._jobs[job.session_id]
+
+    def get_index_status(self, session_id):
+        """
+        Reports indexing coverage for a session, or None if no index exists.
+        Sessions indexed by another worker report the coverage saved to disk.
+        """
+        job = self._jobs.get(session_id)
+        if job:
+            return job.status()
+        status = self._read_status(session_id)
+        if status:
+            status.pop("job_id", None)
+            return status
+        if os.path.exists(os.path.join(self._path(session_id), "index.faiss")):
+            return {
+                "indexed_chunks": None,
+                "total_chunks": None,
+                "coverage": 1.0,
+                "complete": True,
+                "message": "indexed 100% of transcript",
+                "error": None
+            }
+        return None
+
     def load_vector_store(self, session_id):
         """
-        Loads a saved FAISS vector store for a specific session.
+        Loads the FAISS vector store for a session: the live (possibly partial) index
+        while ingestion is running in this process, otherwise the saved one, which
+        may itself be partial if another worker is still indexing.
         """
-        path = os.path.join(Config.VECTOR_STORES_DIR, f"vs_{session_id}")
-        if os.path.exists(path):
-            return FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+        job = self._jobs.get(session_id)
+        if job and job.vector_store is not None:
+            return job.vector_store
+
+        path = self._path(session_id)
+        if os.path.exists(os.path.join(path, "index.faiss")):
+            return FAISS.load_local(path, self.query_embeddings, allow_dangerous_deserialization=True)
         return None
 
     def delete_vector_store(self, session_id):
         """
-        Cleans up vector store files for a session.
+        Cleans up vector store files for a session, stopping any running ingestion.
         """
-        path = os.path.join(Config.VECTOR_STORES_DIR, f"vs_{session_id}")
+        with self._jobs_lock:
+            job = self._jobs.pop(session_id, None)
+        if job:
+            job.cancelled.set()
+
+        path = self._path(session_id)
         if os.path.exists(path):
-            import shutil
             shutil.rmtree(path)
+
+    def get_embedding_stats(self):
+        """
+        Returns query-embedding batching metrics, or None if batching is disabled.
+        In server mode the metrics come from the shared embedding server.
+        """
+        if isinstance(self.query_embeddings, BatchingEmbeddings) or Config.EMBEDDINGS_SERVER_SOCKET:
+            return self.query_embeddings.stats()
+        return None